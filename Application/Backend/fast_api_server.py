@@ -8,11 +8,12 @@ from pathlib import Path
 
 import aiofiles
 from fastapi import FastAPI
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.output_parser import StrOutputParser
 from langchain_community.llms import Ollama
 from loguru import logger
+from pydantic import BaseModel
 
 from Backend.speech_to_text import load_and_transcribe, save_in_txt
 
@@ -24,6 +25,19 @@ CONFIG_FILE_PATH = Path.cwd() / "Application" / "unified_logging" / "configs.tom
 logging_configs = LoggingConfigs.load_from_path(CONFIG_FILE_PATH)
 setup_network_logger_client(logging_configs, logger)
 
+class QueryIn(BaseModel):
+    """Request body carrying the text to be analysed."""
+
+    query: str
+
+def split_summary(response: str) -> dict[str, str]:
+    """Split the summary chain output into its call summary and call theme."""
+    head, _, tail = response.partition("'call_theme':")
+    return {
+        "summary": head.replace("'summary':", "").strip(" ,\n"),
+        "theme": tail.strip(" ,\n"),
+    }
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Preload modules."""
@@ -227,17 +241,17 @@ async def analyze_function_call(query: str) -> dict[str, str]:
     return {"response": str(response)}
 
 
-@app.get("/llm_summary_call")
-async def analyze_summary_call(query: str) -> dict[str, str]:
+@app.post("/llm_summary_call")
+async def analyze_summary_call(body: QueryIn) -> dict[str, dict[str, str]]:
     """Use summary chain to directly respond to summarization or theme queries."""
     logger.info("Summary/theme query received.")
-    response = app.state.summary_chain.invoke({"query": query})
-    return {"response": str(response)}
+    response = app.state.summary_chain.invoke({"query": body.query})
+    return {"response": split_summary(str(response))}
 
 
 @app.get("/process-audio/")
-async def process_audio(file_path: str) -> FileResponse:
-    """Endpoint to process an audio file."""
+async def process_audio(file_path: str) -> JSONResponse:
+    """Endpoint to process an audio file and return its transcript."""
     trs_path = Path(file_path)
     file_path = Path(file_path) / "audio.wav"
 
@@ -246,23 +260,24 @@ async def process_audio(file_path: str) -> FileResponse:
         return JSONResponse(status_code=404, content={"error": "File not found"})
 
     try:
-        transcript_filename = trs_path / "diary.txt"
         transcript_path = trs_path / "diary.txt"
         if transcript_path.exists():
             logger.info(f"Returning existing transcript: {transcript_path}")
-            return FileResponse(str(transcript_path), media_type="text/plain", filename=transcript_filename.name)
+            async with aiofiles.open(transcript_path, encoding="utf-8") as f:
+                content = await f.read()
+            return JSONResponse(content={"diary_path": str(transcript_path), "content": content})
 
         # Perform transcription and diarization asynchronously
         transcript_path.touch(exist_ok=True)
         result = await asyncio.to_thread(load_and_transcribe, str(file_path))
         result_txt = await asyncio.to_thread(save_in_txt, result)
 
-        async with aiofiles.open(transcript_path, "w") as f:
-            for line in result_txt:
-                await f.write(line + "\n")
+        content = "".join(line + "\n" for line in result_txt)
+        async with aiofiles.open(transcript_path, "w", encoding="utf-8") as f:
+            await f.write(content)
 
         logger.info(f"Transcript generated: {transcript_path}")
-        return FileResponse(str(transcript_path), media_type="text/plain", filename=transcript_filename.name)
+        return JSONResponse(content={"diary_path": str(transcript_path), "content": content})
 
     except ValueError as e:
         logger.exception(f"Error processing file '{file_path}': {e}")
@@ -7,13 +7,17 @@ This script allows users to upload either an audio file (.wav) or a transcript (
 """
 
 import asyncio
-import io
+import gc
+import os
+import shutil
 import sys
 import tomllib
 from datetime import UTC, datetime
 from http import HTTPStatus
 from pathlib import Path
+from typing import Final
 
+import aiofiles
 import httpx
 import streamlit as st
 import toml
@@ -23,27 +27,95 @@ sys.path.append(str(Path(__file__).parent.resolve().parent))
 from unified_logging.config_types import LoggingConfigs
 from unified_logging.logging_client import setup_network_logger_client
 
-CONFIG_FILE_PATH = Path.cwd() / "Application" / "unified_logging" / "configs.toml"
-logging_configs = LoggingConfigs.load_from_path(CONFIG_FILE_PATH)
-setup_network_logger_client(logging_configs, logger)
-logger.info("Frontend started.")
+APP_DIR: Final = Path(__file__).parent.resolve().parent
+CONFIG_FILE_PATH: Final = APP_DIR / "unified_logging" / "configs.toml"
+TRANSCRIPTS_DIR: Final = Path("transcripts")
+SAVE_NAMES: Final = {".wav": "audio.wav", ".txt": "diary.txt"}
 
-def load_toml_config(file_path: str = "config.toml") -> dict[str, str]:
-    """Load and parse a toml configuration file."""
+@st.cache_resource(show_spinner=False)
+def _setup_logger() -> None:
+    """Connect the network logger once per process rather than on every rerun."""
+    setup_network_logger_client(LoggingConfigs.load_from_path(CONFIG_FILE_PATH), logger)
+    logger.info("Frontend started.")
+
+_setup_logger()
+
+@st.cache_data(show_spinner=False)
+def _load_toml_config(file_path: str, mtime: float) -> dict[str, str]:  # noqa: ARG001
+    """Parse a toml configuration file, cached on its path and modification time."""
     with Path(file_path).open("rb") as file:
         return tomllib.load(file)
 
-async def call_process_url(call_dir: Path, process_url: str) -> httpx.Response :
+def load_toml_config(file_path: str = "config.toml") -> dict[str, str]:
+    """Load and parse a toml configuration file."""
+    return _load_toml_config(file_path, Path(file_path).stat().st_mtime)
+
+@st.cache_data(show_spinner=False)
+def _load_summary(path: str, mtime: float) -> tuple[str, str]:  # noqa: ARG001
+    """Parse a call summary file into (theme, summary), cached on its path and modification time."""
+    with Path(path).open("rb") as file:
+        data = tomllib.load(file)
+    if "llm_response" not in data:
+        return data["theme"], data["summary"]
+    # Summaries written before the structured format hold the raw llm output
+    head, _, tail = data["llm_response"]["response"].partition("'call_theme':")
+    return tail.strip(" ,\n"), head.replace("'summary':", "").strip(" ,\n")
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _scan_transcripts(root_mtime: int) -> list[dict]:  # noqa: ARG001
+    """Index the call folders under transcripts/, cached on the directory's modification time."""
+    call_entries = []
+    with os.scandir(TRANSCRIPTS_DIR) as it:
+        entries = [e for e in it if e.is_dir(follow_symlinks=False)]
+    # Folder names are call_<timestamp>, so ordering on the timestamp keeps the newest calls first
+    entries.sort(key=lambda e: e.name.removeprefix("call_"), reverse=True)
+    for entry in entries:
+        # One directory read per folder tells us which of the call files are present
+        with os.scandir(entry.path) as it:
+            files = {e.name: e for e in it}
+        theme, summary = None, ""
+        if "call_summary.toml" in files:
+            summary_file = files["call_summary.toml"]
+            theme, summary = _load_summary(summary_file.path, summary_file.stat().st_mtime)
+        call_entries.append({
+            "name": entry.name,
+            "theme": theme,
+            "summary": summary,
+            "txt_path": files["diary.txt"].path if "diary.txt" in files else None,
+        })
+    return call_entries
+
+async def call_process_url(client: httpx.AsyncClient, call_dir: Path, process_url: str) -> httpx.Response :
     """Call the FastAPI process endpoint with the call directory path."""
-    async with httpx.AsyncClient(timeout=1000.0) as client:
-        return await client.get(process_url, params={"file_path": str(call_dir)})
+    return await client.get(process_url, params={"file_path": str(call_dir)})
 
-async def call_llm_summary_url(content: str, summary_url: str) -> dict:
-    """Call the FastAPI LLM summary endpoint asynchronously with the content as query."""
-    async with httpx.AsyncClient(timeout=1000.0) as client:
-        response = await client.get(summary_url, params={"query": content})
+async def call_llm_summary_url(client: httpx.AsyncClient, content: str, summary_url: str) -> dict:
+    """Call the FastAPI LLM summary endpoint asynchronously with the content as the request body."""
+    response = await client.post(summary_url, json={"query": content})
     return response.json()
 
+async def handle_upload(call_dir: Path, content: str | None = None) -> httpx.Response | None:
+    """Summarise the call transcript and store the summary within a single event loop.
+
+    When no transcript content is given, the uploaded audio is transcribed first and its process response returned.
+    """
+    process_response = None
+    # Connections are bound to the event loop that opened them, so the pool lives only as long as this call
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=httpx.Timeout(1000.0, connect=10.0),
+    ) as client:
+        if content is None:
+            process_response = await call_process_url(client, call_dir, FASTAPI_PROCESS_URL)
+            if process_response.status_code != HTTPStatus.OK:
+                return process_response
+            content = process_response.json()["content"]
+        data = await call_llm_summary_url(client, content, FASTAPI_LLM_SUMM_URL)
+    toml_data = {"summary": data["response"]["summary"], "theme": data["response"]["theme"]}
+    async with aiofiles.open(call_dir / "call_summary.toml", "w", encoding="utf-8") as f:
+        await f.write(toml.dumps(toml_data))
+    return process_response
+
 config = load_toml_config()
 
 if "file_uploaded" not in st.session_state:
@@ -55,6 +127,7 @@ if "refresh" not in st.session_state:
 def refresh_page() -> None:
     """Refresh page on button click."""
     st.session_state.refresh = not st.session_state.refresh
+    _scan_transcripts.clear()
 
 FASTAPI_UPLOAD_URL = config["fastapi"]["upload_url"]
 FASTAPI_PROCESS_URL = config["fastapi"]["process_url"]
@@ -72,28 +145,23 @@ ip_file = st.file_uploader("Upload your file (Audio: .wav | Text: .txt)", type=[
 # Processing file given
 if ip_file and not st.session_state.file_uploaded:
     file_name = ip_file.name
-    file_extension = Path(file_name).suffix.lower() #os.path.splitext(file_name)[1].lower()
+    _, dot, extension = file_name.rpartition(".")
+    file_extension = f"{dot}{extension.lower()}" if dot else ""
+    save_name = SAVE_NAMES.get(file_extension)
+    if save_name is None:
+        st.error("❌ Unsupported file type. Please upload a valid audio (.wav) or text (.txt) file.")
+        st.stop()
 
     # Create directory to store the file
     current_time = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
-    call_dir = Path("transcripts") / f"call_{current_time}"
+    call_dir = TRANSCRIPTS_DIR / f"call_{current_time}"
     call_dir.mkdir(parents=True, exist_ok=True)
+    save_path = call_dir / save_name
 
-    # Define the storage path based on file type
-    if file_extension == ".wav":
-        save_path = call_dir / "audio.wav"
-    elif file_extension == ".txt":
-        save_path = call_dir / "diary.txt"
-        # Save the uploaded file
-        with save_path.open("wb") as f: #open(save_path, "wb") as f:
-            f.write(ip_file.getbuffer())
-    else:
-        st.error("❌ Unsupported file type. Please upload a valid audio (.wav) or text (.txt) file.")
-        st.stop()
-
-    # Save the uploaded file
-    with save_path.open("wb") as f:
-        f.write(ip_file.getbuffer())
+    # Save the uploaded file, streamed in chunks rather than one large write
+    ip_file.seek(0)
+    with save_path.open("wb", buffering=1024 * 1024) as f:
+        shutil.copyfileobj(ip_file, f, length=4 * 1024 * 1024)
     st.toast(f"✅ {file_name} uploaded successfully!")
     st.session_state.file_uploaded = True
 
@@ -101,14 +169,11 @@ if ip_file and not st.session_state.file_uploaded:
     if file_extension == ".wav":
         st.info("🎵 Detected **Audio File**. Proceeding to transcription...")
         logger.info("Detected Audio File. Proceeding to transcription...")
-        content=""
         try:
             with st.spinner("Processing audio..."):
-                process_response = asyncio.run(call_process_url(call_dir, FASTAPI_PROCESS_URL))
-                with (call_dir / "diary.txt").open(encoding="utf-8") as file:
-                    content = file.read()
+                process_response = asyncio.run(handle_upload(call_dir))
             if process_response.status_code == HTTPStatus.OK:
-                st.session_state["ip_file"] = content
+                st.session_state["ip_file_path"] = str(call_dir / "diary.txt")
                 st.session_state["file_type"] = 0
                 st.success("✅ Text file stored successfully in session_state!")
             else:
@@ -116,29 +181,27 @@ if ip_file and not st.session_state.file_uploaded:
 
         except httpx.HTTPError as e:
             st.error(f"HTTP Error: {e}")
-        data = asyncio.run(call_llm_summary_url(content, FASTAPI_LLM_SUMM_URL))
-        toml_data = {"llm_response": data}
-        summ_path = call_dir/ "call_summary.toml"
-        with summ_path.open("w") as f:
-            toml.dump(toml_data, f)
 
     # For transcripts
-    elif file_extension == ".txt":
+    else:
         st.toast("📄 Detected **Text File**. Proceeding to analysis...")
         logger.info("Detected Text File")
-        with st.spinner("Processing... Please wait."):
-            st.session_state["ip_file"] = ip_file
-            st.session_state["file_type"] = 0
-            data = asyncio.run(call_llm_summary_url(ip_file.read().decode("utf-8"), FASTAPI_LLM_SUMM_URL))
-            toml_data = {"llm_response": data}
-            summ_path = call_dir/ "call_summary.toml"
-            with summ_path.open("w") as f:
-                toml.dump(toml_data, f)
-
-    # Wrong file type
-    else:
-        st.error("❌ Unsupported file type. Please upload a valid audio (.wav) or text (.txt) file.")
-        st.stop()
+        try:
+            with st.spinner("Processing... Please wait."):
+                content = ip_file.getvalue().decode("utf-8")
+                st.session_state["ip_file_path"] = str(save_path)
+                st.session_state["file_type"] = 0
+                asyncio.run(handle_upload(call_dir, content))
+
+        except httpx.HTTPError as e:
+            st.error(f"HTTP Error: {e}")
+
+    # Files written inside the call folder do not touch the transcripts/ mtime, so rebuild the index explicitly
+    _scan_transcripts.clear()
+
+    # Release the upload buffer and reclaim any reference cycles still holding it
+    del ip_file
+    gc.collect()
 
 def refresh_file() -> None:
     """Refresh file cache on button click."""
@@ -151,38 +214,29 @@ if st.session_state.file_uploaded:
 
 st.header("📂 Uploaded Transcripts")
 st.button("🔄 Refresh", on_click=refresh_page)
-transcripts_dir = Path("transcripts")
 st.write("________________________________________________________________________________________________________")
-if transcripts_dir.exists() and any(transcripts_dir.iterdir()):
-    for call_folder in sorted(transcripts_dir.iterdir(), reverse=True):
-        logger.info(f"Rendering view for {call_folder.name}")
-        if call_folder.is_dir():
-            txt_file = call_folder / "diary.txt"
-            summary_file = call_folder / "call_summary.toml"
-            if summary_file.exists():
-                data = toml.load(summary_file)
-                response_str = data["llm_response"]["response"]
-                parts = response_str.split("'call_theme':")
-            if txt_file.exists():
-                with st.container():
-                    col1, col2, col3 = st.columns([0.45, 0.35,0.2])
-                    with col1:
-                        st.write(f"🗂️ {call_folder.name} ")
-                    with col2:
-                        if summary_file.exists():
-                            st.write( f":blue[Call Theme:] {parts[1].strip(" ,\n")}")
-                        else:
-                            st.write(" ")
-                    with col3:
-                        if st.button("View Analysis", key=str(txt_file)):
-                            # Read the file
-                            with Path(txt_file).open(encoding="utf-8") as f:
-                                content = f.read()
-                            # Store in session state
-                            st.session_state["ip_file"] = io.StringIO(content)
-                            st.session_state["file_type"] = 0
-                            st.switch_page("pages/analytics.py")
-            st.write(f":green[Call Summary:] {parts[0].replace("'summary':", "").strip(" ,\n")}")
-            st.write("________________________________________________________________________________________________________")
+call_entries = _scan_transcripts(TRANSCRIPTS_DIR.stat().st_mtime_ns) if TRANSCRIPTS_DIR.exists() else []
+if call_entries:
+    for call_entry in call_entries:
+        logger.info(f"Rendering view for {call_entry['name']}")
+        txt_file = call_entry["txt_path"]
+        if txt_file is not None:
+            with st.container():
+                col1, col2, col3 = st.columns([0.45, 0.35,0.2])
+                with col1:
+                    st.write(f"🗂️ {call_entry['name']} ")
+                with col2:
+                    if call_entry["theme"] is not None:
+                        st.write( f":blue[Call Theme:] {call_entry['theme']}")
+                    else:
+                        st.write(" ")
+                with col3:
+                    if st.button("View Analysis", key=txt_file):
+                        # Store the transcript path in session state, the analytics page reads it on demand
+                        st.session_state["ip_file_path"] = txt_file
+                        st.session_state["file_type"] = 0
+                        st.switch_page("pages/analytics.py")
+        st.write(f":green[Call Summary:] {call_entry['summary']}")
+        st.write("________________________________________________________________________________________________________")
 else:
     st.info("No previous transcripts found.")
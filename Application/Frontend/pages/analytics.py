@@ -42,8 +42,13 @@ st.title("Call Analysis")
 
 # Load and configure logging
 CONFIG_FILE_PATH = Path.cwd() / "Application" / "unified_logging" / "configs.toml"
-logging_configs = LoggingConfigs.load_from_path(CONFIG_FILE_PATH)
-setup_network_logger_client(logging_configs, logger)
+
+@st.cache_resource(show_spinner=False)
+def _setup_logger() -> None:
+    """Connect the network logger once per process rather than on every rerun."""
+    setup_network_logger_client(LoggingConfigs.load_from_path(CONFIG_FILE_PATH), logger)
+
+_setup_logger()
 logger.info("Starting Analysis.")
 
 def load_toml_config(file_path: str = "config.toml") -> dict[str, str]:
@@ -72,20 +77,14 @@ analysis_type = st.radio(
 )
 
 ## Prevent proceeding if no input file is provided
-if "ip_file" not in st.session_state:
+if "ip_file_path" not in st.session_state:
     st.warning("No file uploaded!")
     st.stop()
 
-ip_file = st.session_state["ip_file"]
-try:
-    content = ip_file.read().decode("utf-8")
-except AttributeError:
-    content = ip_file  # already a string
-except UnicodeDecodeError:
-    content = ip_file.read()
+content = Path(st.session_state["ip_file_path"]).read_text(encoding="utf-8")
 
 ## Fetch analysis for the transcript
-conversation_json, attr_json,sentiment_count = text_to_json(content.getvalue())
+conversation_json, attr_json,sentiment_count = text_to_json(content)
 
 if analysis_type == "Smart Analysis":
     st.subheader("🔍 Smart Call Analysis ")